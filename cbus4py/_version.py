@@ -0,0 +1,7 @@
+"""
+Python implementation of MERG CBUS Protocol.
+
+Package version, the single source read by the build backend and by the modules.
+"""
+
+__version__ = "1.0.0.dev1"
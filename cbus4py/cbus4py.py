@@ -6,20 +6,24 @@ Attributes:
     __version__ : The current version of the module.
 
 """
+import functools
+import mmap
+import os
 import re
 import struct
-from enum import Enum, IntEnum, IntFlag, unique
-from typing import Optional, Type
+from binascii import a2b_hex, b2a_hex
+from enum import Enum, IntEnum, unique
+from typing import Callable, Iterable, Iterator, Optional, Type, Union
 
-from pkg_resources import get_distribution as _get_distribution
-
-#: module version
-__version__ = _get_distribution("cbus4py").version
+from ._version import __version__
 
 
 # ----- Node Flags -----------------------------------------------------------------------------------------------------
-class NodeFlags(IntFlag):
-    """Node bit flags for status."""
+class NodeFlags(IntEnum):
+    """
+    Node bit flags for status. Members are bit positions; :obj:`mask` gives the bit value, e.g.
+    ``flags & NodeFlags.BIT_FLIM_MODE.mask``.
+    """
 
     #: Node is event consumer
     BIT_CONSUMER = 0
@@ -34,10 +38,18 @@ class NodeFlags(IntFlag):
     #: Node is in learn mode
     BIT_LEARN_MODE = 5
 
+    @property
+    def mask(self) -> int:
+        """Bit mask of the flag."""
+        return 1 << self._value_
+
 
 # ----- Command Station status -----------------------------------------------------------------------------------------
-class CommandStationFlags(IntFlag):
-    """Command Station bit flags for status."""
+class CommandStationFlags(IntEnum):
+    """
+    Command Station bit flags for status. Members are bit positions; :obj:`mask` gives the bit value, e.g.
+    ``flags & CommandStationFlags.BIT_TRACK_POWER.mask``.
+    """
 
     #: Self test dectected hardware error
     BIT_HW_ERROR = 0
@@ -56,6 +68,11 @@ class CommandStationFlags(IntFlag):
     #: Reserved
     BIT_RESERVED = 7
 
+    @property
+    def mask(self) -> int:
+        """Bit mask of the flag."""
+        return 1 << self._value_
+
 
 # ----- CAN Header -----------------------------------------------------------------------------------------------------
 class MajorPriority(Enum):
@@ -82,14 +99,68 @@ class MinorPriority(Enum):
     LOW = 3
 
 
+# Priority members indexed by their values.
+_MAJOR_PRIORITIES: tuple[MajorPriority, ...] = tuple(MajorPriority)
+_MINOR_PRIORITIES: tuple[MinorPriority, ...] = tuple(MinorPriority)
+# Priorities used by the :class:`Frame` factories.
+_MAJOR_NORMAL = MajorPriority.NORMAL
+_MINOR_LOW = MinorPriority.LOW
+
+
+def _encode_header(maj: int, mn: int, can_id: int) -> tuple[int, int, bytes, bytes, bytes]:
+    """
+    Computes the SIDH and SIDL register values and the register, ascii and CAN encodings of a header from the raw
+    header field values.
+    """
+    packed = (maj << 14) | (mn << 12) | (can_id << 5)
+    sidh, sidl = packed >> 8, packed & 0xFF
+    reg_header = bytes((sidh, sidl))
+    can_header = bytes((packed >> 13, (packed >> 5) & 0xFF))
+    return sidh, sidl, reg_header, b2a_hex(reg_header).upper(), can_header
+
+
+class _HeaderEncodings(dict):
+    """Header encodings keyed by (major priority, minor priority, CAN ID) values, computed on first use."""
+
+    def __missing__(self, key: tuple[int, int, int]) -> tuple[int, int, bytes, bytes, bytes]:
+        value = self[key] = _encode_header(*key)
+        return value
+
+
+_HEADER_ENCODE = _HeaderEncodings()
+
+#: Header fields indexed by ``(sidh << 3) | (sidl >> 5)``. ``None`` marks an invalid major priority.
+_HEADER_DECODE: list[Optional[tuple[MajorPriority, MinorPriority, int]]] = [
+    (
+        (_MAJOR_PRIORITIES[idx >> 9], _MINOR_PRIORITIES[(idx >> 7) & 0x03], idx & 0x7F)
+        if (idx >> 9) < len(_MAJOR_PRIORITIES)
+        else None
+    )
+    for idx in range(2048)
+]
+
+
 class Header:
     """
     The header of a CAN frame.
+    Headers are immutable.
 
     Raises:
-        ValueError: if the specified value of the :obj:`can_id` is above 127.
+        ValueError: if the specified value of the :obj:`can_id` is not in the range 0..127.
     """
 
+    __slots__ = (
+        "_major_prio",
+        "_minor_prio",
+        "_can_id",
+        "_sidh",
+        "_sidl",
+        "_reg_header",
+        "_ascii_header",
+        "_can_header",
+        "_key",
+    )
+
     @classmethod
     def from_bytes(cls: Type["Header"], data: bytes) -> "Header":
         """
@@ -101,12 +172,43 @@ class Header:
         Returns:
             Header: the CAN header contained in data.
         """
-        sidh = data[0]
-        sidl = data[1]
-        maj_prio = MajorPriority((sidh >> 6) & 0x03)
-        min_prio = MinorPriority((sidh >> 4) & 0x03)
-        can_id = (sidh & 0x0F) << 3 | ((sidl >> 5) & 0x07)
-        return cls(maj_prio, min_prio, can_id)
+        fields = _HEADER_DECODE[(data[0] << 3) | (data[1] >> 5)]
+        if fields is None:
+            raise ValueError("CBUS: Invalid major priority.")
+        return cls(*fields)
+
+    @classmethod
+    def from_bytes_batch(cls: Type["Header"], data: bytes, stride: int = 2, offset: int = 0) -> list["Header"]:
+        """
+        Factory method that constructs the CAN headers of a batch of fixed size records, e.g. a binary trace.
+
+        Equal headers in the batch are decoded once and shared. Headers are immutable.
+
+        Args:
+            data (bytes): bytes object containing the records.
+            stride (int, optional): size of each record. Defaults to 2.
+            offset (int, optional): position of the header in each record. Defaults to 0.
+
+        Raises:
+            ValueError: if a header does not fit in a record at the offset.
+
+        Returns:
+            list[Header]: the CAN headers, one per record.
+        """
+        if stride < 2 or not 0 <= offset <= stride - 2:
+            raise ValueError("CBUS: Invalid record stride or header offset.")
+        count = max(0, (len(data) - offset - 2) // stride + 1)
+        end = offset + count * stride
+        decoded: dict[int, Header] = {}
+        headers: list[Header] = []
+        append = headers.append
+        for sidh, sidl in zip(data[offset:end:stride], data[offset + 1 : end : stride]):
+            idx = (sidh << 3) | (sidl >> 5)
+            header = decoded.get(idx)
+            if header is None:
+                header = decoded[idx] = cls.from_bytes(bytes((sidh, sidl)))
+            append(header)
+        return headers
 
     def __init__(self, maj_prio: MajorPriority, min_prio: MinorPriority, can_id: int) -> None:
         """
@@ -118,36 +220,40 @@ class Header:
             can_id (int): CAN identifier.
 
         Raises:
-            ValueError: if the specified value of the CAN identifier is above 127.
+            ValueError: if the specified value of the CAN identifier is not in the range 0..127.
         """
-        if can_id > 127:
-            raise ValueError("CBUS: CAN ID must be <= 127.")
+        if can_id & ~0x7F:
+            raise ValueError("CBUS: CAN ID must be in the range 0..127.")
         self._major_prio: MajorPriority = maj_prio
         self._minor_prio: MinorPriority = min_prio
         self._can_id: int = can_id
-        self._make_header()
+        (
+            self._sidh,
+            self._sidl,
+            self._reg_header,
+            self._ascii_header,
+            self._can_header,
+        ) = _HEADER_ENCODE[(maj_prio._value_, min_prio._value_, can_id)]
+        self._key: int = (self._sidh << 8) | self._sidl
 
     def __str__(self) -> str:
-        return f"<{self.major_priority.value}><{self.minor_priority.value}><{self.can_id}>"
+        return f"<{self._major_prio._value_}><{self._minor_prio._value_}><{self._can_id}>"
 
     def __repr__(self) -> str:
         return str(self)
 
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Header):
-            return False
-        return (self.sidl == other.sidl) and (self.sidh == other.sidh)
+        # Headers are usually shared instances, see :meth:`Frame._normal_header`.
+        return self is other or (isinstance(other, Header) and self._key == other._key)
+
+    def __hash__(self) -> int:
+        return self._key
 
     @property
     def major_priority(self) -> MajorPriority:
         """The major priority of the CAN header."""
         return self._major_prio
 
-    @major_priority.setter
-    def major_priority(self, value: MajorPriority) -> None:
-        self._major_prio = value
-        self._make_header()
-
     @property
     def minor_priority(self) -> MinorPriority:
         """The minor priority of the CAN header."""
@@ -177,23 +283,33 @@ class Header:
         registers of microprocessors like PIC 18Fxx8x series.
         Data is left aligned and padded with 5 zeros to the right.
         """
-        return bytes([self._sidh, self._sidl])
+        return self._reg_header
 
     @property
     def ascii_header(self) -> bytes:
-        """The CAN header as a `bytes` object with ascii-encoded data."""
-        return bytes(self.reg_header.hex(), "ascii")
+        """The CAN header as a `bytes` object with upper-case ascii-encoded data."""
+        return self._ascii_header
 
     @property
     def can_header(self) -> bytes:
         """The CAN header as a `bytes` object with raw data."""
-        return bytes([self._sidh >> 5, ((self._sidh & 0x1F) << 3) | ((self._sidl >> 5) & 0x07)])
+        return self._can_header
+
+
+class _HeadersByHex(dict):
+    """Headers keyed by their 4 hex digits as found in network frames, decoded on first use."""
+
+    #: Bounds the cache: real traffic only uses a few headers, but the keys come from the network.
+    MAX_SIZE = 4096
 
-    def _make_header(self) -> None:
-        self._sidh = self._major_prio.value << 6
-        self._sidh |= self._minor_prio.value << 4
-        self._sidh |= self._can_id >> 3
-        self._sidl = (self._can_id & 0x7) << 5
+    def __missing__(self, key: bytes) -> Header:
+        header = Header.from_bytes(a2b_hex(key))
+        if len(self) < self.MAX_SIZE:
+            self[key] = header
+        return header
+
+
+_HEADER_BY_HEX = _HeadersByHex()
 
 
 # ----- CBUS Message ---------------------------------------------------------------------------------------------------
@@ -209,26 +325,33 @@ class OpCodeKind(IntEnum):
 
 
 @unique
-class OpCode(bytes, Enum):
+class OpCode(IntEnum):
     """
     Enumeration of the CBUS opcodes.
-    It inherits from `bytes` in order to ease the encoding/decoding of CBUS messages.
+    Members are the opcode values; ``bytes(opcode)`` gives the opcode encoded as a single byte.
 
     Attributes:
         _minor_prio (MinorPriority): opcode's minor priority
         _kind (OpCodeKind): opcode's type
+        _byte (bytes): opcode encoded as a single byte
+        _byte_count (int): number of bytes following the opcode
     """
 
     def __init__(self, *args) -> None:
         super().__init__()
         self._minor_prio: MinorPriority = args[1]
         self._kind: OpCodeKind = args[2]
+        self._byte: bytes = bytes((args[0],))
+        self._byte_count: int = args[0] >> 5
 
     def __new__(cls, value, *_args) -> "OpCode":
-        obj = bytes.__new__(cls, [value])
+        obj = int.__new__(cls, value)
         obj._value_ = value
         return obj
 
+    def __bytes__(self) -> bytes:
+        return self._byte
+
     @property
     def minor_priority(self) -> MinorPriority:
         """Opcode's minor priority."""
@@ -499,69 +622,135 @@ class OpCode(bytes, Enum):
     @property
     def byte_count(self):
         """Number of bytes following opcode."""
-        return self.value >> 5
+        return self._byte_count
 
     @property
     def is_general(self):
         """Test if it's a general opcode."""
-        return self._kind == OpCodeKind.GENERAL
+        return self in _GENERAL_OPCODES
 
     @property
     def is_config(self):
         """Test if it's a configuration opcode."""
-        return self._kind == OpCodeKind.CONFIG
+        return self in _CONFIG_OPCODES
 
     @property
     def is_accessory(self):
         """Test if it's an accessory opcode."""
-        return self._kind == OpCodeKind.ACCESSORY
+        return self in _ACCESSORY_OPCODES
 
     @property
     def is_dcc(self):
         """Test if it's a DCC opcode."""
-        return self._kind == OpCodeKind.DCC
+        return self in _DCC_OPCODES
+
+
+#: Opcode members indexed by their numeric value.
+_OPCODE_BY_VALUE: dict[int, OpCode] = {op._value_: op for op in OpCode}
+
+# Opcodes grouped by kind, backing the ``OpCode.is_*`` properties.
+_GENERAL_OPCODES = frozenset(op for op in OpCode if op._kind is OpCodeKind.GENERAL)
+_CONFIG_OPCODES = frozenset(op for op in OpCode if op._kind is OpCodeKind.CONFIG)
+_ACCESSORY_OPCODES = frozenset(op for op in OpCode if op._kind is OpCodeKind.ACCESSORY)
+_DCC_OPCODES = frozenset(op for op in OpCode if op._kind is OpCodeKind.DCC)
+
+#: Number of data bytes following each opcode.
+_OPCODE_BYTE_COUNT: dict[OpCode, int] = {op: op._byte_count for op in OpCode}
+
+#: Zero filled data for each possible data length, shared by messages built without data.
+_ZERO_DATA: tuple[bytes, ...] = tuple(bytes(size) for size in range(8))
+
+#: Text of each data byte value in :meth:`Message.__str__`, e.g. ``<AB>``.
+_BYTE_STR: tuple[str, ...] = tuple(f"<{byte:X}>" for byte in range(256))
+
+# Precompiled payload layouts used by the :class:`Message` factories.
+_S_B = struct.Struct("!B")
+_S_H = struct.Struct("!H")
+_S_HB = struct.Struct("!HB")
+_S_2H = struct.Struct("!2H")
+_S_H2B = struct.Struct("!H2B")
+_S_H3B = struct.Struct("!H3B")
+_S_3HB = struct.Struct("!3HB")
+_S_H5B = struct.Struct("!H5B")
+_S_BH4B = struct.Struct("!BH4B")
+_S_7B = struct.Struct("!7B")
+
+#: Payload layout of the opcodes built by the :class:`Message` factories, decoded by :obj:`Message.fields`.
+_OPCODE_LAYOUT: dict[OpCode, struct.Struct] = {
+    OpCode.ACON: _S_2H,
+    OpCode.ACOF: _S_2H,
+    OpCode.ERR: _S_HB,
+    OpCode.CMDERR: _S_HB,
+    OpCode.DKEEP: _S_B,
+    OpCode.RLOC: _S_H,
+    OpCode.KLOC: _S_B,
+    OpCode.PLOC: _S_BH4B,
+    OpCode.STAT: _S_H5B,
+    OpCode.PNN: _S_H3B,
+    OpCode.PARAMS: _S_7B,
+    OpCode.PARAN: _S_H2B,
+    OpCode.NVANS: _S_H2B,
+    OpCode.NNACK: _S_H,
+    OpCode.WRACK: _S_H,
+    OpCode.NUMEV: _S_HB,
+    OpCode.ENRSP: _S_3HB,
+    OpCode.NEVAL: _S_H3B,
+}
+
+# Cache of :class:`struct.Struct` objects used by :meth:`Message.unpack_data`.
+_UNPACK_CACHE: dict[str, struct.Struct] = {}
 
 
 class Message:
+    __slots__ = ("_opcode", "_data", "_message")
+
     @classmethod
     def from_bytes(cls: Type["Message"], data: bytes) -> "Message":
         try:
-            opcode = OpCode(data[0])
+            opcode = _OPCODE_BY_VALUE.get(data[0])
         except IndexError as exc:
             raise ValueError("CBUS: Invalid opcode") from exc
+        if opcode is None:
+            raise ValueError("CBUS: Unknown opcode")
+        if len(data) == 1 and cls is Message:
+            message = _EMPTY_MESSAGES.get(opcode)
+            if message is not None:
+                return message
         return cls(opcode, data[1:])
 
     @classmethod
     def make_acknowledge(cls: Type["Message"]) -> "Message":
-        return cls(OpCode.ACK)
+        return _EMPTY_MESSAGES[OpCode.ACK] if cls is Message else cls(OpCode.ACK)
 
     @classmethod
     def make_accesory_long_event_on(cls: Type["Message"], node: int, event: int) -> "Message":
-        return cls(OpCode.ACON, struct.pack("!2H", node, event))
+        return cls(OpCode.ACON, _S_2H.pack(node, event))
 
     @classmethod
     def make_accesory_long_event_off(cls: Type["Message"], node: int, event: int) -> "Message":
-        return cls(OpCode.ACOF, struct.pack("!2H", node, event))
+        return cls(OpCode.ACOF, _S_2H.pack(node, event))
 
     @classmethod
     def make_command_station_error(cls: Type["Message"], loco_address: int, error_code: int) -> "Message":
-        return cls(OpCode.ERR, struct.pack("!HB", loco_address, error_code))
+        return cls(OpCode.ERR, _S_HB.pack(loco_address, error_code))
 
     @classmethod
     def make_config_error(cls: Type["Message"], node_number: int, error_code: int) -> "Message":
-        return cls(OpCode.CMDERR, struct.pack("!HB", node_number, error_code))
+        return cls(OpCode.CMDERR, _S_HB.pack(node_number, error_code))
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def make_session_keep_alive(cls: Type["Message"], session: int) -> "Message":
-        return cls(OpCode.DKEEP, struct.pack("!B", session))
+        return cls(OpCode.DKEEP, _S_B.pack(session))
 
     @classmethod
     def make_request_engine_session(cls: Type["Message"], loco_address: int) -> "Message":
-        return cls(OpCode.RLOC, struct.pack("!H", loco_address))
+        return cls(OpCode.RLOC, _S_H.pack(loco_address))
 
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def make_release_engine(cls: Type["Message"], session: int) -> "Message":
-        return cls(OpCode.KLOC, struct.pack("!B", session))
+        return cls(OpCode.KLOC, _S_B.pack(session))
 
     @classmethod
     def make_engine_report(
@@ -575,7 +764,7 @@ class Message:
         if fns is None:
             fns = [0, 0, 0]
         speed_dir = (speed & 0x7F) | (direction << 7)
-        return cls(OpCode.PLOC, struct.pack("!BH4B", session, loco_address, speed_dir, *fns))
+        return cls(OpCode.PLOC, _S_BH4B.pack(session, loco_address, speed_dir, *fns))
 
     @classmethod
     def make_command_station_report(
@@ -589,7 +778,7 @@ class Message:
     ) -> "Message":
         return cls(
             OpCode.STAT,
-            struct.pack("!H5B", node_number, cs_number, flags, rev_major, rev_minor, build),
+            _S_H5B.pack(node_number, cs_number, flags, rev_major, rev_minor, build),
         )
 
     @classmethod
@@ -602,40 +791,40 @@ class Message:
     ) -> "Message":
         return cls(
             OpCode.PNN,
-            struct.pack("!H3B", node_number, manufacturer_id, module_id, flags),
+            _S_H3B.pack(node_number, manufacturer_id, module_id, flags),
         )
 
     @classmethod
     def make_node_params(cls: Type["Message"], params: list[int]) -> "Message":
-        return cls(OpCode.PARAMS, struct.pack("!7B", *params[:7]))
+        return cls(OpCode.PARAMS, _S_7B.pack(*params[:7]))
 
     @classmethod
     def make_parameter(cls: Type["Message"], node_number: int, param_number: int, param_value: int) -> "Message":
-        return cls(OpCode.PARAN, struct.pack("!H2B", node_number, param_number, param_value))
+        return cls(OpCode.PARAN, _S_H2B.pack(node_number, param_number, param_value))
 
     @classmethod
     def make_read_node_var(cls: Type["Message"], node_number: int, nv_number: int, nv_value: int) -> "Message":
-        return cls(OpCode.NVANS, struct.pack("!H2B", node_number, nv_number, nv_value))
+        return cls(OpCode.NVANS, _S_H2B.pack(node_number, nv_number, nv_value))
 
     @classmethod
     def make_node_number_ack(cls: Type["Message"], node_number: int) -> "Message":
-        return cls(OpCode.NNACK, struct.pack("!H", node_number))
+        return cls(OpCode.NNACK, _S_H.pack(node_number))
 
     @classmethod
     def make_write_ack(cls: Type["Message"], node_number: int) -> "Message":
-        return cls(OpCode.WRACK, struct.pack("!H", node_number))
+        return cls(OpCode.WRACK, _S_H.pack(node_number))
 
     @classmethod
     def make_module_name(cls: Type["Message"], name: str) -> "Message":
-        return cls(OpCode.NAME, struct.pack("!7s", name[:7].encode("ascii")))
+        return cls(OpCode.NAME, name[:7].encode("ascii").ljust(7, b"\x00"))
 
     @classmethod
     def make_stored_event_num(cls: Type["Message"], node_number: int, ev_num: int) -> "Message":
-        return cls(OpCode.NUMEV, struct.pack("!HB", node_number, ev_num))
+        return cls(OpCode.NUMEV, _S_HB.pack(node_number, ev_num))
 
     @classmethod
     def make_event_read_resp(cls: Type["Message"], node_number: int, ev_nn: int, ev_num: int, ev_idx: int) -> "Message":
-        return cls(OpCode.ENRSP, struct.pack("!HHHB", node_number, ev_nn, ev_num, ev_idx))
+        return cls(OpCode.ENRSP, _S_3HB.pack(node_number, ev_nn, ev_num, ev_idx))
 
     @classmethod
     def make_event_value_read_resp(
@@ -647,34 +836,38 @@ class Message:
     ) -> "Message":
         return cls(
             OpCode.NEVAL,
-            struct.pack("!HBBB", node_number, ev_idx, ev_var_idx, ev_var_val),
+            _S_H3B.pack(node_number, ev_idx, ev_var_idx, ev_var_val),
         )
 
     @classmethod
     def make_emergency_stop(cls: Type["Message"]) -> "Message":
-        return cls(OpCode.ESTOP)
+        return _EMPTY_MESSAGES[OpCode.ESTOP] if cls is Message else cls(OpCode.ESTOP)
 
     def __init__(self, opcode: OpCode, data: Optional[bytes] = None) -> None:
-        self._opcode: OpCode = opcode
-        byte_cnt = opcode.byte_count
-        if data is not None and len(data) != byte_cnt:
+        byte_cnt = _OPCODE_BYTE_COUNT[opcode]
+        if data is None:
+            data = _ZERO_DATA[byte_cnt]
+        elif len(data) != byte_cnt:
             raise ValueError(f"CBUS: Invalid data for message {opcode.name}")
-        self._data: bytes = bytes(byte_cnt) if data is None else data
+        self._opcode: OpCode = opcode
+        self._data: bytes = data
+        self._message: bytes = opcode._byte + data
 
     def __str__(self) -> str:
-        return f"<{self._opcode.name}>" + "".join([f"<{self._data[k]:X}>" for k in range(len(self._data))])
+        return f"<{self._opcode.name}>" + "".join([_BYTE_STR[byte] for byte in self._data])
 
     @property
     def ascii(self) -> str:
-        return f"{self._opcode.value:02X}" + "".join([f"{self._data[k]:02X}" for k in range(len(self._data))])
+        return f"{self._opcode._value_:02X}{self._data.hex().upper()}"
 
     def __repr__(self) -> str:
         return str(self)
 
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Message):
-            return False
-        return (self._opcode == other._opcode) and (self._data == other._data)
+        return isinstance(other, Message) and self._message == other._message
+
+    def __hash__(self) -> int:
+        return hash(self._message)
 
     @property
     def opcode(self) -> OpCode:
@@ -686,7 +879,37 @@ class Message:
 
     @property
     def message(self) -> bytes:
-        return bytes([self._opcode.value]) + bytes(self.data)
+        return self._message
+
+    @property
+    def fields(self) -> Optional[tuple[int, ...]]:
+        """
+        The data decoded into the fields packed by the factory of the message opcode, e.g. node and event numbers
+        for ACON, or None if the opcode has no known layout.
+        """
+        layout = _OPCODE_LAYOUT.get(self._opcode)
+        return layout.unpack(self._data) if layout is not None else None
+
+    def message_into(self, buffer: bytearray, offset: int = 0) -> int:
+        """
+        Writes the message (opcode followed by data) into a buffer without building an intermediate `bytes`.
+
+        Args:
+            buffer (bytearray): destination buffer. It must have room for the whole message.
+            offset (int, optional): position of the opcode in the buffer. Defaults to 0.
+
+        Raises:
+            ValueError: if the message does not fit in the buffer at the offset.
+
+        Returns:
+            int: the offset just past the written message.
+        """
+        end = offset + 1 + len(self._data)
+        if offset < 0 or end > len(buffer):
+            raise ValueError("CBUS: Buffer too small for message")
+        buffer[offset] = self._opcode._value_
+        buffer[offset + 1 : end] = self._data
+        return end
 
     @property
     def is_dcc(self) -> bool:
@@ -701,20 +924,56 @@ class Message:
         return len(self._data) != 0
 
     def unpack_data(self, fmt: str, idx: int = 0) -> tuple[int, ...]:
-        size = struct.calcsize(fmt)
-        return struct.unpack(fmt, self._data[idx : idx + size])
+        unpacker = _UNPACK_CACHE.get(fmt)
+        if unpacker is None:
+            unpacker = _UNPACK_CACHE[fmt] = struct.Struct(fmt)
+        return unpacker.unpack_from(self._data, idx)
+
+
+#: Shared message of each opcode without data, returned by the parameterless factories. Messages are immutable.
+_EMPTY_MESSAGES: dict[OpCode, Message] = {op: Message(op) for op in OpCode if op._byte_count == 0}
+
+
+class _FramePrefixes(dict):
+    """
+    Network encoding prefixes (``:S``, header and type) of normal and RTR frames, keyed by the header's ascii encoding
+    and computed on first use.
+    """
+
+    def __missing__(self, ascii_header: bytes) -> tuple[bytes, bytes]:
+        prefix = b":S" + ascii_header
+        value = self[ascii_header] = (prefix + b"N", prefix + b"R")
+        return value
+
+
+_FRAME_PREFIXES = _FramePrefixes()
+
+#: GridConnect frame: header, frame type (normal or RTR) and message, all hex digits but the type.
+# Only RTR frames, e.g. void frames, may have no data: the lookahead requires a body after N.
+_FRAME_FORMAT = b":S([0-9a-fA-F]{4})(N(?=[0-9a-fA-F])|R)([0-9a-fA-F]*);"
+_FRAME_RE = re.compile(_FRAME_FORMAT, re.ASCII)
 
 
 class Frame:
-    FORMAT = b":S([0-9a-fA-F]{4})([NR])([0-9a-fA-F]+);"
-    format = re.compile(FORMAT)
+    __slots__ = ("_header", "_message", "_rtr", "_encoded", "_raw_body", "_hash", "_str")
+
+    FORMAT = _FRAME_FORMAT
+    format = _FRAME_RE
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _normal_header(minor_prio: MinorPriority, can_id: int) -> Header:
+        """Returns a shared normal major priority header. Headers are immutable."""
+        return Header(_MAJOR_NORMAL, minor_prio, can_id)
+
+    @classmethod
+    def _normal_frame(cls: Type["Frame"], can_id: int, msg: Message) -> "Frame":
+        """Makes a normal major priority frame with the minor priority of the message opcode."""
+        return cls(cls._normal_header(msg._opcode._minor_prio, can_id), msg)
 
     @classmethod
     def make_emergency_stop(cls: Type["Frame"], can_id: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.ESTOP.minor_priority, can_id),
-            Message.make_emergency_stop(),
-        )
+        return cls._normal_frame(can_id, Message.make_emergency_stop())
 
     @classmethod
     def make_engine_report(
@@ -726,19 +985,11 @@ class Frame:
         direction: int,
         fns: Optional[list[int]] = None,
     ) -> "Frame":
-        if fns is None:
-            fns = [0, 0, 0]
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.PLOC.minor_priority, can_id),
-            Message.make_engine_report(session, loco_address, speed, direction, fns),
-        )
+        return cls._normal_frame(can_id, Message.make_engine_report(session, loco_address, speed, direction, fns))
 
     @classmethod
     def make_command_station_error(cls: Type["Frame"], can_id: int, loco_address: int, error_code: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.ERR.minor_priority, can_id),
-            Message.make_command_station_error(loco_address, error_code),
-        )
+        return cls._normal_frame(can_id, Message.make_command_station_error(loco_address, error_code))
 
     @classmethod
     def make_command_station_report(
@@ -751,9 +1002,8 @@ class Frame:
         rev_minor: int,
         build: int = 0,
     ) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.STAT.minor_priority, can_id),
-            Message.make_command_station_report(node_number, cs_number, flags, rev_major, rev_minor, build),
+        return cls._normal_frame(
+            can_id, Message.make_command_station_report(node_number, cs_number, flags, rev_major, rev_minor, build)
         )
 
     @classmethod
@@ -765,24 +1015,17 @@ class Frame:
         module_id: int,
         flags: int,
     ) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.PNN.minor_priority, can_id),
-            Message.make_query_node_response(node_number, manufacturer_id, module_id, flags),
+        return cls._normal_frame(
+            can_id, Message.make_query_node_response(node_number, manufacturer_id, module_id, flags)
         )
 
     @classmethod
     def make_node_params(cls: Type["Frame"], can_id: int, params: list[int]) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.PARAMS.minor_priority, can_id),
-            Message.make_node_params(params),
-        )
+        return cls._normal_frame(can_id, Message.make_node_params(params))
 
     @classmethod
     def make_node_number_ack(cls: Type["Frame"], can_id: int, node_number: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NNACK.minor_priority, can_id),
-            Message.make_node_number_ack(node_number),
-        )
+        return cls._normal_frame(can_id, Message.make_node_number_ack(node_number))
 
     @classmethod
     def make_parameter(
@@ -792,45 +1035,27 @@ class Frame:
         param_number: int,
         param_value: int,
     ) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.PARAN.minor_priority, can_id),
-            Message.make_parameter(node_number, param_number, param_value),
-        )
+        return cls._normal_frame(can_id, Message.make_parameter(node_number, param_number, param_value))
 
     @classmethod
     def make_read_node_var(cls: Type["Frame"], can_id: int, node_number: int, nv_number: int, nv_value: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NVANS.minor_priority, can_id),
-            Message.make_read_node_var(node_number, nv_number, nv_value),
-        )
+        return cls._normal_frame(can_id, Message.make_read_node_var(node_number, nv_number, nv_value))
 
     @classmethod
     def make_config_error(cls: Type["Frame"], can_id: int, node_number: int, error_code: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.CMDERR.minor_priority, can_id),
-            Message.make_config_error(node_number, error_code),
-        )
+        return cls._normal_frame(can_id, Message.make_config_error(node_number, error_code))
 
     @classmethod
     def make_module_name(cls: Type["Frame"], can_id: int, name: str) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NAME.minor_priority, can_id),
-            Message.make_module_name(name),
-        )
+        return cls._normal_frame(can_id, Message.make_module_name(name))
 
     @classmethod
     def make_write_ack(cls: Type["Frame"], can_id: int, node_number: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.WRACK.minor_priority, can_id),
-            Message.make_write_ack(node_number),
-        )
+        return cls._normal_frame(can_id, Message.make_write_ack(node_number))
 
     @classmethod
     def make_stored_event_num(cls: Type["Frame"], can_id: int, node_number: int, ev_num: int) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NUMEV.minor_priority, can_id),
-            Message.make_stored_event_num(node_number, ev_num),
-        )
+        return cls._normal_frame(can_id, Message.make_stored_event_num(node_number, ev_num))
 
     @classmethod
     def make_event_read_resp(
@@ -839,12 +1064,9 @@ class Frame:
         node_number: int,
         ev_nn: int,
         ev_num: int,
-        ev_idx,
+        ev_idx: int,
     ) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NUMEV.minor_priority, can_id),
-            Message.make_event_read_resp(node_number, ev_nn, ev_num, ev_idx),
-        )
+        return cls._normal_frame(can_id, Message.make_event_read_resp(node_number, ev_nn, ev_num, ev_idx))
 
     @classmethod
     def make_event_value_read_resp(
@@ -853,26 +1075,126 @@ class Frame:
         node_number: int,
         ev_idx: int,
         ev_var_idx: int,
-        ev_var_val,
+        ev_var_val: int,
     ) -> "Frame":
-        return cls(
-            Header(MajorPriority.NORMAL, OpCode.NUMEV.minor_priority, can_id),
-            Message.make_event_value_read_resp(node_number, ev_idx, ev_var_idx, ev_var_val),
+        return cls._normal_frame(
+            can_id, Message.make_event_value_read_resp(node_number, ev_idx, ev_var_idx, ev_var_val)
         )
 
     @classmethod
+    def make(cls: Type["Frame"], opcode: OpCode, can_id: int, *args, **kwargs) -> "Frame":
+        """
+        Makes a frame with the Frame factory of an opcode, e.g. ``Frame.make(OpCode.WRACK, can_id, node_number)``.
+
+        Args:
+            opcode (OpCode): the opcode of the message.
+            can_id (int): the CAN ID of the frame.
+            args, kwargs: the arguments of the opcode's message factory.
+
+        Raises:
+            ValueError: if there is no factory for the opcode.
+
+        Returns:
+            Frame: the frame.
+        """
+        try:
+            factory = _FRAME_FACTORIES[opcode]
+        except KeyError:
+            raise ValueError(f"CBUS: No frame factory for opcode {opcode.name}") from None
+        return factory(cls, can_id, *args, **kwargs)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
     def make_void(cls: Type["Frame"], can_id: int) -> "Frame":
-        return cls(Header(MajorPriority.NORMAL, MinorPriority.LOW, can_id), None, rtr=True)
+        return cls(cls._normal_header(_MINOR_LOW, can_id), None, rtr=True)
 
     @classmethod
-    def from_network_bytes(cls: Type["Frame"], data: bytes) -> list["Frame"]:
-        frames_spec = cls.format.findall(data)
-        frames = list()
-        for frame in frames_spec:
-            header = Header.from_bytes(bytes.fromhex(frame[0].decode("ascii")))
-            msg = Message.from_bytes(bytes.fromhex(frame[2].decode("ascii")))
-            frames.append(cls(header, msg, rtr=frame[1] == "R"))
-        return frames
+    def iter_frames(
+        cls: Type["Frame"], data: Union[bytes, bytearray, memoryview], lazy: bool = False
+    ) -> Iterator["Frame"]:
+        """
+        Iterates over the frames found in data received from TCP, parsing each one when it is reached.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview]): the received data, e.g. a view of a receive buffer,
+                which is scanned in place without copying it.
+            lazy (bool, optional): True to defer decoding each message until its frame's :obj:`message` is first
+                accessed, so invalid messages raise then. Defaults to False.
+
+        Yields:
+            Frame: the frames, in order. RTR frames without data, e.g. void frames, have no message. Normal frames
+            without data are not frames and are skipped.
+        """
+        from_match = cls._from_match
+        for match in _FRAME_RE.finditer(data):
+            yield from_match(match, lazy)
+
+    @classmethod
+    def _from_match(cls: Type["Frame"], match: re.Match, lazy: bool) -> "Frame":
+        """Builds the frame of a frame pattern match, see :meth:`iter_frames`."""
+        header, typ, body = match.groups()
+        rtr = typ == b"R"
+        if not body:
+            return cls(_HEADER_BY_HEX[header], None, rtr=True)
+        if lazy:
+            frame = cls(_HEADER_BY_HEX[header], None, rtr=rtr)
+            frame._raw_body = body
+            return frame
+        return cls(_HEADER_BY_HEX[header], Message.from_bytes(a2b_hex(body)), rtr=rtr)
+
+    @classmethod
+    def iter_file_frames(
+        cls: Type["Frame"], path: Union[str, bytes, os.PathLike], lazy: bool = False
+    ) -> Iterator["Frame"]:
+        """
+        Iterates over the frames of a captured log file. The file is memory mapped instead of read, so it is
+        never loaded whole into memory.
+
+        Args:
+            path (Union[str, bytes, os.PathLike]): the log file path.
+            lazy (bool, optional): see :meth:`iter_frames`. Defaults to False.
+
+        Yields:
+            Frame: the frames, in order.
+        """
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield from cls.iter_frames(data, lazy)
+
+    @classmethod
+    def from_network_bytes(
+        cls: Type["Frame"], data: Union[bytes, bytearray, memoryview], lazy: bool = False
+    ) -> list["Frame"]:
+        """
+        Parses the frames found in data received from TCP.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview]): the received data.
+            lazy (bool, optional): see :meth:`iter_frames`. Defaults to False.
+
+        Returns:
+            list[Frame]: the frames, in order.
+        """
+        # Reads often hold a single frame, which is matched whole without going through the frame iterator.
+        match = _FRAME_RE.fullmatch(data)
+        if match is not None:
+            return [cls._from_match(match, lazy)]
+        return list(cls.iter_frames(data, lazy))
+
+    @staticmethod
+    def encode_many(frames: Iterable["Frame"]) -> bytes:
+        """
+        Encodes frames for TCP as a single buffer, ready to be sent at once.
+
+        Args:
+            frames (Iterable[Frame]): the frames to encode.
+
+        Returns:
+            bytes: the concatenation of the frames' :obj:`net_encoded_frame`.
+        """
+        return b"".join([frame.net_encoded_frame for frame in frames])
 
     def __init__(self, header: Header, msg: Optional[Message], rtr: bool = False) -> None:
         """
@@ -886,14 +1208,27 @@ class Frame:
         self._header: Header = header
         self._message: Optional[Message] = msg
         self._rtr = rtr
+        self._encoded: Optional[bytes] = None
+        self._raw_body: Optional[bytes] = None
+        self._hash: Optional[int] = None
+        self._str: Optional[str] = None
 
     def __str__(self) -> str:
-        return str(self._header) + str(self._message)
+        if self._str is None:
+            self._str = f"{self._header}{self.message}"
+        return self._str
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Frame):
             return False
-        return (self._header == other._header) and (self._message == other._message)
+        return self._rtr == other._rtr and self._header == other._header and self.message == other.message
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._header, self.message, self._rtr))
+        return self._hash
 
     @property
     def is_rtr(self) -> bool:
@@ -914,6 +1249,9 @@ class Frame:
         """
         The frame message if any.
         """
+        if self._raw_body is not None:
+            self._message = Message.from_bytes(a2b_hex(self._raw_body))
+            self._raw_body = None
         return self._message
 
     @property
@@ -926,8 +1264,107 @@ class Frame:
     @property
     def net_encoded_frame(self) -> bytes:
         """
-        The frame encoded for TCP.
+        The frame encoded for TCP, computed on first access.
+        """
+        if self._encoded is None:
+            prefix = _FRAME_PREFIXES[self._header.ascii_header][self._rtr]
+            message = self.message
+            msg = b2a_hex(message.message).upper() if message is not None else b""
+            self._encoded = prefix + msg + b";"
+        return self._encoded
+
+
+#: Frame factories by the opcode of their message, as functions taking the class, used by :meth:`Frame.make`.
+_FRAME_FACTORIES: dict[OpCode, Callable[..., Frame]] = {
+    opcode: vars(Frame)[name].__func__
+    for opcode, name in (
+        (OpCode.ESTOP, "make_emergency_stop"),
+        (OpCode.PLOC, "make_engine_report"),
+        (OpCode.ERR, "make_command_station_error"),
+        (OpCode.STAT, "make_command_station_report"),
+        (OpCode.PNN, "make_query_node_response"),
+        (OpCode.PARAMS, "make_node_params"),
+        (OpCode.NNACK, "make_node_number_ack"),
+        (OpCode.PARAN, "make_parameter"),
+        (OpCode.NVANS, "make_read_node_var"),
+        (OpCode.CMDERR, "make_config_error"),
+        (OpCode.NAME, "make_module_name"),
+        (OpCode.WRACK, "make_write_ack"),
+        (OpCode.NUMEV, "make_stored_event_num"),
+        (OpCode.ENRSP, "make_event_read_resp"),
+        (OpCode.NEVAL, "make_event_value_read_resp"),
+    )
+}
+
+
+class FrameStream:
+    """
+    Incremental parser of the frames received from a TCP stream, where reads may split frames.
+
+    Data is fed as it is received, e.g. ``for frame in stream.feed(sock.recv(4096))``. Complete frames are parsed and
+    returned; the bytes after the last frame terminator are kept until the next read completes them.
+    """
+
+    __slots__ = ("_buffer", "_lazy", "_errors")
+
+    #: Length of the longest frame: ``:S``, 4 header digits, type, 8 message bytes in hex and ``;``.
+    MAX_FRAME_SIZE = 24
+
+    def __init__(self, lazy: bool = False) -> None:
+        """
+        Initializes a frame stream.
+
+        Args:
+            lazy (bool, optional): see :meth:`Frame.iter_frames`. Defaults to False.
+        """
+        self._buffer = bytearray()
+        self._lazy = lazy
+        self._errors: list[tuple[bytes, ValueError]] = []
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> list[Frame]:
+        """
+        Adds received data to the stream.
+
+        Complete frames are parsed one by one, so an invalid frame, e.g. one with an opcode unknown to
+        :class:`OpCode`, does not prevent parsing the others. Invalid frames are dropped and reported by
+        :obj:`errors`.
+
+        Args:
+            data (Union[bytes, bytearray, memoryview]): the received data.
+
+        Returns:
+            list[Frame]: the valid frames completed by the data, in order.
+        """
+        buffer = self._buffer
+        buffer += data
+        end = buffer.rfind(b";") + 1
+        frames: list[Frame] = []
+        self._errors = errors = []
+        if end:
+            from_match = Frame._from_match
+            lazy = self._lazy
+            for match in _FRAME_RE.finditer(bytes(buffer[:end])):
+                try:
+                    frames.append(from_match(match, lazy))
+                except ValueError as exc:
+                    errors.append((match.group(), exc))
+        # Keep the unterminated tail, from its last frame start, unless it is longer than a frame can be.
+        start = buffer.rfind(b":", end)
+        if start < 0 or len(buffer) - start >= self.MAX_FRAME_SIZE:
+            start = len(buffer)
+        del buffer[:start]
+        return frames
+
+    @property
+    def errors(self) -> list[tuple[bytes, ValueError]]:
+        """
+        The invalid frames dropped by the last :meth:`feed`, as pairs of the frame bytes and the parsing error.
+        """
+        return self._errors
+
+    @property
+    def pending(self) -> bytes:
+        """
+        The received bytes waiting for the rest of their frame.
         """
-        typ = "N" if self.is_normal else "R"
-        msg = self.message.ascii if self.message is not None else ""
-        return f":S{self._header.ascii_header.decode('ascii').upper()}{typ}{msg};".encode("ascii")
+        return bytes(self._buffer)
@@ -18,10 +18,33 @@ class CBusError(Exception):
 
     """
 
+    #: Error classes by code of the errors with a fixed message, filled in for each base class that defines them.
+    _ERRORS: dict[int, type["CBusError"]] = {}
+
     def __init__(self, message: str, code: int) -> None:
         super().__init__(message)
         self._code = code
 
+    @classmethod
+    def for_code(cls, code: int) -> "CBusError":
+        """
+        Makes the error with a fixed message that has the given code, e.g. ``CommadStationError.for_code(1)`` is
+        a :class:`LocoStackFullError`.
+
+        Args:
+            code (int): the error code.
+
+        Raises:
+            ValueError: if the class has no error with this code.
+
+        Returns:
+            CBusError: the error.
+        """
+        try:
+            return cls._ERRORS[code]()
+        except KeyError:
+            raise ValueError(f"CBUS: Unknown {cls.__name__} code {code}.") from None
+
     @property
     def code(self):
         """Returns the exception error code."""
@@ -105,6 +128,18 @@ class SessionCancelledError(CommadStationError):
         super().__init__("CS: Session cancelled.", self.SESSION_CANCELLED)
 
 
+CommadStationError._ERRORS = {
+    CommadStationError.LOCO_STACK_FULL: LocoStackFullError,
+    CommadStationError.LOCO_ADDRESS_TAKEN: LocoAddressTakenError,
+    CommadStationError.SESSION_NOT_PRESENT: SessionNotPresentError,
+    CommadStationError.CONSIST_EMPTY: ConsistEmptyError,
+    CommadStationError.LOCO_NOT_FOUND: LocoNotFoundError,
+    CommadStationError.CAN_BUS_ERROR: CanBusError,
+    CommadStationError.INVALID_REQUEST: InvalidRequestError,
+    CommadStationError.SESSION_CANCELLED: SessionCancelledError,
+}
+
+
 class ConfigError(CBusError):
     """Configuration Error."""
 
@@ -131,70 +166,84 @@ class ConfigError(CBusError):
 
 
 class CommandNotSupportedError(ConfigError):
-    """Command Not Supported Error. Error code :const:`CommadStationError.COMMAND_NOT_SUPPORTED`."""
+    """Command Not Supported Error. Error code :const:`ConfigError.COMMAND_NOT_SUPPORTED`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Command not supported.", self.COMMAND_NOT_SUPPORTED)
 
 
 class NotInLearnModeError(ConfigError):
-    """Not In Learn Mode Error. Error code :const:`CommadStationError.NOT_IN_LEARN_MODE`."""
+    """Not In Learn Mode Error. Error code :const:`ConfigError.NOT_IN_LEARN_MODE`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Not in learn mode.", self.NOT_IN_LEARN_MODE)
 
 
 class NotInSetupModeError(ConfigError):
-    """Not In Setup Mode Error. Error code :const:`CommadStationError.NOT_IN_SETUP_MODE`."""
+    """Not In Setup Mode Error. Error code :const:`ConfigError.NOT_IN_SETUP_MODE`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Not in setup mode.", self.NOT_IN_SETUP_MODE)
 
 
 class TooManyEventsError(ConfigError):
-    """Too Many Events Error. Error code :const:`CommadStationError.TOO_MANY_EVENTS`."""
+    """Too Many Events Error. Error code :const:`ConfigError.TOO_MANY_EVENTS`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Too many events", self.TOO_MANY_EVENTS)
 
 
 class InvalidEventError(ConfigError):
-    """Invalid Event Error. Error code :const:`CommadStationError.INVALID_EVENT`."""
+    """Invalid Event Error. Error code :const:`ConfigError.INVALID_EVENT`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid event.", self.INVALID_EVENT)
 
 
 class InvalidEventVariableIndexError(ConfigError):
-    """Invalid Event Variable Index Error. Error code :const:`CommadStationError.INVALID_EVENT_VARIABLE_INDEX`."""
+    """Invalid Event Variable Index Error. Error code :const:`ConfigError.INVALID_EVENT_VARIABLE_INDEX`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid event variable index.", self.INVALID_EVENT_VARIABLE_INDEX)
 
 
 class InvalidEventVariableValueError(ConfigError):
-    """Invalid Event Variable Value Error. Error code :const:`CommadStationError.INVALID_EVENT_VARIABLE_VALUE`."""
+    """Invalid Event Variable Value Error. Error code :const:`ConfigError.INVALID_EVENT_VARIABLE_VALUE`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid event variable value.", self.INVALID_EVENT_VARIABLE_VALUE)
 
 
 class InvalidNodeVariableIndexError(ConfigError):
-    """Invalid Node Variable Index Error. Error code :const:`CommadStationError.INVALID_NODE_VARIABLE_INDEX`."""
+    """Invalid Node Variable Index Error. Error code :const:`ConfigError.INVALID_NODE_VARIABLE_INDEX`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid node variable index.", self.INVALID_NODE_VARIABLE_INDEX)
 
 
 class InvalidNodeVariableValueError(ConfigError):
-    """Invalid Node Variable Value Error. Error code :const:`CommadStationError.INVALID_NODE_VARIABLE_VALUE`."""
+    """Invalid Node Variable Value Error. Error code :const:`ConfigError.INVALID_NODE_VARIABLE_VALUE`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid node variable value.", self.INVALID_NODE_VARIABLE_VALUE)
 
 
 class InvalidParameterIndexError(ConfigError):
-    """Invalid Parameter Index Error. Error code :const:`CommadStationError.INVALID_PARAMETER_INDEX`."""
+    """Invalid Parameter Index Error. Error code :const:`ConfigError.INVALID_PARAMETER_INDEX`."""
 
     def __init__(self) -> None:
         super().__init__("CFG: Invalid parameter index.", self.INVALID_PARAMETER_INDEX)
+
+
+ConfigError._ERRORS = {
+    ConfigError.COMMAND_NOT_SUPPORTED: CommandNotSupportedError,
+    ConfigError.NOT_IN_LEARN_MODE: NotInLearnModeError,
+    ConfigError.NOT_IN_SETUP_MODE: NotInSetupModeError,
+    ConfigError.TOO_MANY_EVENTS: TooManyEventsError,
+    ConfigError.INVALID_EVENT: InvalidEventError,
+    ConfigError.INVALID_EVENT_VARIABLE_INDEX: InvalidEventVariableIndexError,
+    ConfigError.INVALID_EVENT_VARIABLE_VALUE: InvalidEventVariableValueError,
+    ConfigError.INVALID_NODE_VARIABLE_INDEX: InvalidNodeVariableIndexError,
+    ConfigError.INVALID_NODE_VARIABLE_VALUE: InvalidNodeVariableValueError,
+    ConfigError.INVALID_PARAMETER_INDEX: InvalidParameterIndexError,
+}
@@ -1,13 +1,27 @@
 """Tests of cbus4py module."""
+import os
+import tempfile
 from unittest import TestCase, main
 
 import cbus4py.cbus4py as cbus
+import cbus4py.cbus_error as cbus_error
 
 # TODO: Tests de excepciones,
 
 # TODO: Más tests (de factorías, por ejemplo)
 
 
+class TestFlags(TestCase):
+    """Tests of CBUS status flags."""
+
+    def test_mask(self):
+        """Test bit positions and masks."""
+        self.assertEqual(cbus.NodeFlags.BIT_CONSUMER, 0)
+        self.assertEqual(cbus.NodeFlags.BIT_FLIM_MODE.mask, 0x04)
+        self.assertEqual(cbus.CommandStationFlags.BIT_RESERVED.mask, 0x80)
+        self.assertEqual(len(cbus.NodeFlags), 6)
+
+
 class TestHeader(TestCase):
     """Tests of CBUS :obj:Header class."""
 
@@ -15,6 +29,8 @@ class TestHeader(TestCase):
         """Test constructor."""
         with self.assertRaises(ValueError):
             cbus.Header(cbus.MajorPriority.NORMAL, cbus.MinorPriority.NORMAL, can_id=256)
+        with self.assertRaises(ValueError):
+            cbus.Header(cbus.MajorPriority.NORMAL, cbus.MinorPriority.NORMAL, can_id=-1)
         header = cbus.Header(cbus.MajorPriority.NORMAL, cbus.MinorPriority.NORMAL, can_id=127)
         self.assertIsNotNone(header)
 
@@ -23,6 +39,23 @@ class TestHeader(TestCase):
         header_1 = cbus.Header.from_bytes(b"\x74\x20")
         header_2 = cbus.Header(cbus.MajorPriority.HIGH, cbus.MinorPriority.LOW, can_id=33)
         self.assertEqual(header_1, header_2)
+        self.assertEqual(hash(header_1), hash(header_2))
+        with self.assertRaises(ValueError):
+            cbus.Header.from_bytes(b"\xc0\x00")
+
+    def test_from_bytes_batch(self):
+        """Test factory from a batch of records."""
+        headers = cbus.Header.from_bytes_batch(b"\x74\x20\x00\x0f\xe0\x01\x74\x20\x02\x74", stride=3)
+        header_1 = cbus.Header.from_bytes(b"\x74\x20")
+        header_2 = cbus.Header.from_bytes(b"\x0f\xe0")
+        self.assertEqual(headers, [header_1, header_2, header_1])
+        self.assertIs(headers[0], headers[2])
+        self.assertEqual(cbus.Header.from_bytes_batch(b"\x00\x74\x20", stride=3, offset=1), [headers[0]])
+        for stride, offset in ((0, 0), (1, 0), (2, 1), (3, -1)):
+            with self.assertRaises(ValueError):
+                cbus.Header.from_bytes_batch(b"\x74\x20\x74\x20", stride=stride, offset=offset)
+        with self.assertRaises(ValueError):
+            cbus.Header.from_bytes_batch(b"\xc0\x00")
 
     def test_str(self):
         """Test string representation of instances."""
@@ -35,6 +68,8 @@ class TestHeader(TestCase):
         self.assertEqual(header.major_priority, cbus.MajorPriority.HIGH)
         self.assertEqual(header.minor_priority, cbus.MinorPriority.ABOVE_NORMAL)
         self.assertEqual(header.can_id, 66)
+        with self.assertRaises(AttributeError):
+            header.major_priority = cbus.MajorPriority.NORMAL
 
     def test_values(self):
         """Test values as registers, CAN and ASCII."""
@@ -44,6 +79,7 @@ class TestHeader(TestCase):
         self.assertEqual(header.reg_header, bytes([0x7420 >> 8, 0x7420 & 0xFF]))
         self.assertEqual(header.can_header, bytes([(0x7420 >> 5) >> 8, (0x7420 >> 5) & 0xFF]))
         self.assertEqual(header.ascii_header.upper(), b"7420")
+        self.assertEqual(cbus.Header.from_bytes(b"\x0f\xe0").ascii_header, b"0FE0")
 
 
 class TestOpcode(TestCase):
@@ -60,6 +96,20 @@ class TestOpcode(TestCase):
         self.assertEqual(cbus.OpCode.ACON2.byte_count, 6)
         self.assertEqual(cbus.OpCode.ACON3.byte_count, 7)
 
+    def test_kind(self):
+        """Test opcode kind properties."""
+        self.assertTrue(cbus.OpCode.ACK.is_general)
+        self.assertTrue(cbus.OpCode.QNN.is_config)
+        self.assertTrue(cbus.OpCode.ACON.is_accessory)
+        self.assertTrue(cbus.OpCode.ESTOP.is_dcc)
+        self.assertFalse(cbus.OpCode.ESTOP.is_general)
+
+    def test_values(self):
+        """Test opcode values and byte encoding."""
+        self.assertEqual(cbus.OpCode.ACON, 0x90)
+        self.assertEqual(bytes(cbus.OpCode.ACON), b"\x90")
+        self.assertEqual(cbus.OpCode(0x90), cbus.OpCode.ACON)
+
 
 class TestMessage(TestCase):
     """Test of CBUS :obj:Message class."""
@@ -78,11 +128,37 @@ class TestMessage(TestCase):
         msg_1 = cbus.Message.from_bytes(bytes([0x99, 0x00, 0x00, 0x00, 0x12]))
         msg_2 = cbus.Message(cbus.OpCode.ASOF, bytes([0x00, 0x00, 0x00, 0x12]))
         self.assertEqual(msg_1, msg_2)
+        self.assertEqual(hash(msg_1), hash(msg_2))
+        with self.assertRaises(ValueError):
+            cbus.Message.from_bytes(b"")
+        with self.assertRaises(ValueError):
+            cbus.Message.from_bytes(b"\x0b")
 
     def test_accessory_messages(self):
         """Test factories."""
         msg = cbus.Message.make_accesory_long_event_on(10, 64321)
         self.assertEqual(str(msg).casefold(), "<ACON><0><a><fb><41>".casefold())
+        self.assertEqual(msg.ascii, "90000AFB41")
+
+    def test_shared_messages(self):
+        """Test factories returning shared instances."""
+        self.assertIs(cbus.Message.make_acknowledge(), cbus.Message.make_acknowledge())
+        self.assertIs(cbus.Message.from_bytes(b"\x00"), cbus.Message.make_acknowledge())
+        self.assertEqual(cbus.Message.make_emergency_stop(), cbus.Message(cbus.OpCode.ESTOP))
+        self.assertIs(cbus.Message.make_session_keep_alive(3), cbus.Message.make_session_keep_alive(3))
+        self.assertEqual(cbus.Message.make_release_engine(3).message, b"\x21\x03")
+
+        class SubMessage(cbus.Message):
+            pass
+
+        self.assertIs(type(SubMessage.make_acknowledge()), SubMessage)
+        self.assertIs(type(SubMessage.make_emergency_stop()), SubMessage)
+        self.assertIs(type(SubMessage.from_bytes(b"\x00")), SubMessage)
+
+    def test_module_name(self):
+        """Test module name factory."""
+        self.assertEqual(cbus.Message.make_module_name("CANCAB").data, b"CANCAB\x00")
+        self.assertEqual(cbus.Message.make_module_name("CANACC5X").data, b"CANACC5")
 
     def test_properties(self):
         """Test properties of instances."""
@@ -97,6 +173,33 @@ class TestMessage(TestCase):
         msg = cbus.Message(cbus.OpCode.ACON, bytes([0x01, 0x10, 0x20, 0x30]))
         self.assertEqual(msg.message, bytes([cbus.OpCode.ACON.value, 0x01, 0x10, 0x20, 0x30]))
 
+    def test_message_into(self):
+        """Test writing messages into a buffer."""
+        buffer = bytearray(8)
+        msg = cbus.Message(cbus.OpCode.ACON, bytes([0x01, 0x10, 0x20, 0x30]))
+        self.assertEqual(msg.message_into(buffer, 2), 7)
+        self.assertEqual(bytes(buffer), b"\x00\x00" + msg.message + b"\x00")
+        with self.assertRaises(ValueError):
+            msg.message_into(buffer, 4)
+        self.assertEqual(len(buffer), 8)
+        with self.assertRaises(ValueError):
+            msg.message_into(bytearray(2))
+
+    def test_fields(self):
+        """Test decoding of message fields."""
+        msg = cbus.Message.from_bytes(b"\x90\x00\x0a\xfb\x41")
+        self.assertEqual(msg.fields, (10, 64321))
+        msg = cbus.Message.make_event_read_resp(0x0102, 0x0304, 0x0506, 7)
+        self.assertEqual(msg.fields, (0x0102, 0x0304, 0x0506, 7))
+        self.assertIsNone(cbus.Message.make_module_name("CANCAB").fields)
+
+    def test_unpack_data(self):
+        """Test unpacking of message data."""
+        msg = cbus.Message.make_event_read_resp(0x0102, 0x0304, 0x0506, 7)
+        self.assertEqual(msg.unpack_data("!H"), (0x0102,))
+        self.assertEqual(msg.unpack_data("!HB", 4), (0x0506, 7))
+        self.assertEqual(msg.unpack_data("!HHHB"), (0x0102, 0x0304, 0x0506, 7))
+
 
 class FrameTest(TestCase):
     """Test of CBUS :obj:Frame class."""
@@ -108,6 +211,24 @@ class FrameTest(TestCase):
         frame = cbus.Frame(header, msg)
         self.assertEqual(header, frame.header)
         self.assertEqual(msg, frame.message)
+        self.assertEqual(frame, cbus.Frame(header, msg))
+        self.assertEqual(hash(frame), hash(cbus.Frame(header, msg)))
+        self.assertNotEqual(frame, cbus.Frame(header, msg, rtr=True))
+        self.assertEqual(len({cbus.Frame.make_void(1), cbus.Frame.make_void(1)}), 1)
+        self.assertEqual(str(frame), "<0><1><85><ACON><0><A><0><7F>")
+        self.assertIs(str(frame), str(frame))
+
+    def test_factories(self):
+        """Test factories."""
+        frame = cbus.Frame.make_emergency_stop(5)
+        self.assertEqual(frame.header, cbus.Header(cbus.MajorPriority.NORMAL, cbus.OpCode.ESTOP.minor_priority, 5))
+        self.assertEqual(frame.message, cbus.Message.make_emergency_stop())
+        self.assertIs(cbus.Frame.make_write_ack(5, 1).header, cbus.Frame.make_write_ack(5, 2).header)
+        self.assertIs(cbus.Frame.make_void(5), cbus.Frame.make_void(5))
+        self.assertEqual(cbus.Frame.make(cbus.OpCode.WRACK, 5, 1), cbus.Frame.make_write_ack(5, 1))
+        with self.assertRaises(ValueError):
+            cbus.Frame.make(cbus.OpCode.ACK, 5)
+        self.assertTrue(cbus.Frame.make_void(5).is_rtr)
 
     def test_from_network_bytes(self):
         """Test factory from network bytes."""
@@ -124,6 +245,119 @@ class FrameTest(TestCase):
         frames = cbus.Frame.from_network_bytes(net_str)
         self.assertEqual(len(frames), 2)
         self.assertEqual(frames, [frame_0, frame_1])
+        self.assertEqual(cbus.Frame.from_network_bytes(b":S0fe0N40000a;"), [frame_0])
+        self.assertFalse(frames[0].is_rtr)
+        self.assertTrue(cbus.Frame.from_network_bytes(b":S0FE0R40000A;")[0].is_rtr)
+        with self.assertRaises(ValueError):
+            cbus.Frame.from_network_bytes(b":S0FE0N40000;")
+        with self.assertRaises(ValueError):
+            cbus.Frame.from_network_bytes(b":SC000N01;")
+        self.assertIs(cbus.Frame.from_network_bytes(net_str)[1].header, frames[0].header)
+        self.assertEqual(cbus.Frame.from_network_bytes(net_str, lazy=True), [frame_0, frame_1])
+        buffer = bytearray(net_str)
+        self.assertEqual(cbus.Frame.from_network_bytes(memoryview(buffer)[14:]), [frame_1])
+        frame = cbus.Frame.from_network_bytes(b":S0FE0N40000;", lazy=True)[0]
+        with self.assertRaises(ValueError):
+            frame.message
+        void = cbus.Frame.make_void(127)
+        self.assertEqual(cbus.Frame.from_network_bytes(void.net_encoded_frame), [void])
+        self.assertEqual(cbus.Frame.from_network_bytes(void.net_encoded_frame, lazy=True), [void])
+        self.assertEqual(cbus.Frame.from_network_bytes(b":S0FE0N;"), [])
+        self.assertEqual(cbus.Frame.from_network_bytes(b":S0FE0N40000A;:S0FE0N;", lazy=True), [frame_0])
+        ack = cbus.Frame(header, cbus.Message.make_acknowledge())
+        self.assertEqual(cbus.Frame.from_network_bytes(b":S0FE0N00;:S0FE0N;"), [ack])
+
+    def test_iter_frames(self):
+        """Test iteration over network bytes."""
+        frames = cbus.Frame.iter_frames(b":S0FE0N40000A;:S0FE0N4000;")
+        self.assertEqual(next(frames).message, cbus.Message.make_request_engine_session(10))
+        with self.assertRaises(ValueError):
+            next(frames)
+
+    def test_iter_file_frames(self):
+        """Test iteration over a log file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cbus.log")
+            with open(path, "wb") as file:
+                file.write(b":S0FE0N40000A;\n:S0FE0N2310;\n")
+            frames = list(cbus.Frame.iter_file_frames(path))
+            self.assertEqual(frames, cbus.Frame.from_network_bytes(b":S0FE0N40000A;:S0FE0N2310;"))
+            open(path, "wb").close()
+            self.assertEqual(list(cbus.Frame.iter_file_frames(path)), [])
+
+    def test_net_encoded_frame(self):
+        """Test network encoding."""
+        header = cbus.Header(cbus.MajorPriority.EMERGENCY, cbus.MinorPriority.HIGH, can_id=127)
+        frame = cbus.Frame(header, cbus.Message.make_request_engine_session(10))
+        self.assertEqual(frame.net_encoded_frame, b":S0FE0N40000A;")
+        self.assertIs(frame.net_encoded_frame, frame.net_encoded_frame)
+        self.assertEqual(cbus.Frame.make_void(127).net_encoded_frame, b":SBFE0R;")
+        frames = cbus.Frame.from_network_bytes(b":S0FE0N40000A;:S0FE0N2310;")
+        self.assertEqual(cbus.Frame.encode_many(frames), b":S0FE0N40000A;:S0FE0N2310;")
+        self.assertEqual(cbus.Frame.encode_many([]), b"")
+
+
+class TestFrameStream(TestCase):
+    """Test of CBUS :obj:FrameStream class."""
+
+    def test_feed(self):
+        """Test feeding split frames."""
+        frame_0, frame_1 = cbus.Frame.from_network_bytes(b":S0FE0N40000A;:S0FE0N2310;")
+        stream = cbus.FrameStream()
+        self.assertEqual(stream.feed(b":S0FE0N40"), [])
+        self.assertEqual(stream.pending, b":S0FE0N40")
+        self.assertEqual(stream.feed(b"000A;:S0FE0"), [frame_0])
+        self.assertEqual(stream.feed(b"N2310;"), [frame_1])
+        self.assertEqual(stream.pending, b"")
+
+    def test_garbage(self):
+        """Test that data which cannot be part of a frame is dropped."""
+        stream = cbus.FrameStream()
+        self.assertEqual(stream.feed(b"garbage"), [])
+        self.assertEqual(stream.pending, b"")
+        self.assertEqual(stream.feed(b":S0FE0N40000A0000000000000000000"), [])
+        self.assertEqual(stream.pending, b"")
+        self.assertEqual(stream.feed(b":S0FE0N40000;:S0FE0N23"), [])
+        self.assertEqual([frame for frame, _ in stream.errors], [b":S0FE0N40000;"])
+        self.assertEqual(stream.feed(b"10;"), cbus.Frame.from_network_bytes(b":S0FE0N2310;"))
+        self.assertEqual(stream.errors, [])
+
+    def test_invalid_frame(self):
+        """Test that an invalid frame does not drop the valid frames around it."""
+        frame_0, frame_1 = cbus.Frame.from_network_bytes(b":S0FE0N40000A;:S0FE0N2310;")
+        stream = cbus.FrameStream()
+        self.assertEqual(stream.feed(b":S0FE0N40000A;:S0FE0N0B;:S0FE0N2310;"), [frame_0, frame_1])
+        self.assertEqual(stream.pending, b"")
+        ((frame, error),) = stream.errors
+        self.assertEqual(frame, b":S0FE0N0B;")
+        self.assertIsInstance(error, ValueError)
+
+
+class TestErrors(TestCase):
+    """Test of CBUS errors."""
+
+    def test_fixed_errors(self):
+        """Test errors with a fixed message and code."""
+        error = cbus_error.LocoStackFullError()
+        self.assertIsInstance(error, cbus_error.CommadStationError)
+        self.assertEqual(error.code, cbus_error.CommadStationError.LOCO_STACK_FULL)
+        self.assertEqual(str(error), "CS: Loco stack full.")
+        error = cbus_error.InvalidNodeVariableValueError()
+        self.assertIsInstance(error, cbus_error.ConfigError)
+        self.assertEqual(error.code, cbus_error.ConfigError.INVALID_NODE_VARIABLE_VALUE)
+        self.assertEqual(type(error).__module__, "cbus4py.cbus_error")
+
+    def test_for_code(self):
+        """Test errors made from their code."""
+        error = cbus_error.CommadStationError.for_code(cbus_error.CommadStationError.SESSION_CANCELLED)
+        self.assertIsInstance(error, cbus_error.SessionCancelledError)
+        self.assertEqual(str(error), "CS: Session cancelled.")
+        error = cbus_error.ConfigError.for_code(1)
+        self.assertIsInstance(error, cbus_error.CommandNotSupportedError)
+        with self.assertRaises(ValueError):
+            cbus_error.ConfigError.for_code(5)
+        with self.assertRaises(ValueError):
+            cbus_error.CBusError.for_code(1)
 
 
 if __name__ == "__main__":